@@ -2,6 +2,7 @@ import aiohttp
 from aiohttp import web
 import argparse
 import asyncio
+import atexit
 import base64
 from http import HTTPStatus
 from http.client import HTTPConnection, InvalidURL
@@ -11,6 +12,7 @@ import logging
 import logging.handlers
 import os
 import paho.mqtt.client as mqtt
+import queue
 from retry import retry
 import signal
 import socket
@@ -24,9 +26,13 @@ import threading
 import time
 import _thread
 from urllib.parse import parse_qs, urlparse, ParseResult
+try:
+  import uvloop
+except ImportError:
+  uvloop = None
 
 from .app_mappings import SECRET_MAP
-from .config import Config
+from .config import Config, has_aes_ni
 from .error import Error
 from .aircon import Device
 from .discovery import perform_discovery
@@ -41,7 +47,7 @@ async def query_status_device(device: Device):
   while True:
     # In case the AC is stuck, and not fetching commands, avoid flooding
     # the queue with status updates.
-    while device.commands_queue.qsize() > 10:
+    while len(device.commands_queue) > 10:
       await asyncio.sleep(_WAIT_FOR_EMPTY_QUEUE)
     device.queue_status()
     await asyncio.sleep(_STATUS_UPDATE_INTERVAL)
@@ -125,6 +131,14 @@ def setup_logger(log_level, use_stderr=False):
                         style='{'))
   logger = logging.getLogger()
   logger.setLevel(log_level)
+  if isinstance(logging_handler, logging.handlers.SysLogHandler):
+    # Syslog records are handed to a background thread, so its socket doesn't block the loop.
+    # The stream and journal handlers stay synchronous, so no record is lost on SIGTERM.
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, logging_handler)
+    listener.start()
+    atexit.register(listener.stop)
+    logging_handler = logging.handlers.QueueHandler(log_queue)
   logger.addHandler(logging_handler)
 
 
@@ -151,20 +165,15 @@ async def setup_and_run_http_server(parsed_args, devices: [Device]):
       # '/local_lan/regtoken.json': query_handlers.module_request_handler,
       # '/local_lan/wifi_stop_ap.json': query_handlers.module_request_handler
   ])
-  runner = web.AppRunner(app)
+  runner = web.AppRunner(app, access_log=None)
   await runner.setup()
   site = web.TCPSite(runner, port=parsed_args.port)
   await site.start()
 
 
-async def mqtt_loop(mqtt_client: MqttClient):
-  _MQTT_LOOP_TIMEOUT = 1
-  while True:
-    mqtt_client.loop()
-    await asyncio.sleep(_MQTT_LOOP_TIMEOUT)
-
-
 async def run(parsed_args):
+  if not has_aes_ni():
+    logging.warning('AES-NI is not available; using the slower software AES implementation.')
   notifier = Notifier(parsed_args.port, parsed_args.local_ip)
   devices = []
   for i in range(len(parsed_args.config)):
@@ -190,6 +199,7 @@ async def run(parsed_args):
     if parsed_args.mqtt_user:
       mqtt_client.username_pw_set(*parsed_args.mqtt_user.split(':', 1))
     mqtt_client.will_set(mqtt_topics['lwt'], payload='offline', retain=True)
+    mqtt_client.attach_to_event_loop(asyncio.get_running_loop())
     mqtt_client.connect(parsed_args.mqtt_host, parsed_args.mqtt_port)
     mqtt_client.publish(mqtt_topics['lwt'], payload='online', retain=True)
     for device in devices:
@@ -248,8 +258,14 @@ async def run(parsed_args):
       device.add_property_change_listener(mqtt_client.mqtt_publish_update)
 
   async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(connect=5.0)) as session:
-    await asyncio.gather(mqtt_loop(mqtt_client), setup_and_run_http_server(parsed_args, devices),
-                         query_status_worker(devices), notifier.start(session))
+    tasks = [
+        setup_and_run_http_server(parsed_args, devices),
+        query_status_worker(devices),
+        notifier.start(session)
+    ]
+    if mqtt_client:
+      tasks.append(mqtt_client.misc_loop())
+    await asyncio.gather(*tasks)
 
 
 def _escape_name(name: str):
@@ -269,7 +285,7 @@ async def discovery(parsed_args):
 
   for config in all_configs:
     properties_text = ''
-    if 'properties' in config.keys():
+    if 'properties' in config:
       properties_text = f'Properties:\n{json.dumps(config["properties"], indent=2)}'
     print(
         textwrap.dedent(f"""Device {config['product_name']} has:
@@ -300,6 +316,9 @@ if __name__ == '__main__':
 
   if parsed_args.cmd == 'run':
     setup_logger(parsed_args.log_level)
+    if uvloop:
+      # Cheaper event loop for the many small request handlers, when available.
+      asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     asyncio.run(run(parsed_args))
   elif parsed_args.cmd == 'discovery':
     setup_logger(parsed_args.log_level, use_stderr=True)
@@ -1,14 +1,13 @@
-from copy import deepcopy
-from dataclasses import dataclass, field, fields
-import enum
+from dataclasses import dataclass, field, replace
+import heapq
+import itertools
 import logging
 import random
 import re
 import string
 import threading
 import time
-from typing import Any, Callable, Dict, List
-import queue
+from typing import Any, Callable, Dict, List, Optional
 from Crypto.Cipher import AES
 
 from . import control_value
@@ -18,6 +17,8 @@ from .properties import (AcProperties, AirFlow, AirFlowState, Economy, FanSpeed,
                          FglProperties, FglBProperties, HumidifierProperties, Properties, Power,
                          AcWorkMode, Quiet, TemperatureUnit, SleepMode)
 
+_COMMAND_ID_ALPHABET = string.ascii_letters + string.digits
+
 
 @dataclass(order=True)
 class Command:
@@ -44,8 +45,13 @@ class Device(object):
     self.temp_type = (TemperatureUnit.CELSIUS
                       if config.get('temp_type') == 'C' else TemperatureUnit.FAHRENHEIT)
     self._config = Config(config['lanip_key'], config['lanip_key_id'])
+    # An immutable snapshot, replaced on every change. Readers take no lock;
+    # writers serialize on the lock.
     self._properties = properties
     self._properties_lock = threading.RLock()
+    self._properties_dict = (None, None)  # (snapshot, to_dict() of that snapshot)
+    self._properties_version = 0  # Bumped on every change of a stored property.
+    self._notified_properties = set()  # Properties already sent to the listeners.
     self._queue_listener = notifier
     self._available = None
     self.topics = {}
@@ -53,10 +59,12 @@ class Device(object):
     self.fan_modes = []
 
     self._next_command_id = 0
+    # Resources polled by queue_status, built once as the properties are fixed per device.
+    self._status_resources = tuple('property.json?name=' + name for name in properties.get_names())
 
-    self.commands_queue = queue.PriorityQueue()
-    self._commands_seq_no = 0
-    self._commands_seq_no_lock = threading.Lock()
+    # A heap of pending commands. Only touched from the event loop, so it needs no lock.
+    self.commands_queue = []  # type List[Command]
+    self._commands_seq_no = itertools.count()  # next() is atomic, so needs no lock.
 
     self._updates_seq_no = 0
     self._updates_seq_no_lock = threading.Lock()
@@ -100,13 +108,27 @@ class Device(object):
       listener(self.mac_address, prop_name, value, retain)
 
   def get_all_properties(self) -> Properties:
-    with self._properties_lock:
-      return deepcopy(self._properties)
+    return self._properties
+
+  @property
+  def properties_version(self) -> int:
+    return self._properties_version
+
+  def get_properties_dict(self) -> dict:
+    """Get the stored properties, serialized into a dict (shared; do not modify)."""
+    properties = self._properties
+    cached_properties, properties_dict = self._properties_dict
+    if cached_properties is not properties:
+      properties_dict = properties.to_dict()
+      self._properties_dict = (properties, properties_dict)
+    return properties_dict
 
   def get_property(self, name: str):
     """Get a stored property (or None if doesn't exist)."""
-    with self._properties_lock:
-      return getattr(self._properties, name, None)
+    return getattr(self._properties, name, None)
+
+  def get_property_names(self) -> tuple:
+    return self._properties.get_names()
 
   def get_property_type(self, name: str):
     return self._properties.get_type(name)
@@ -123,21 +145,27 @@ class Device(object):
 
     with self._properties_lock:
       old_value = getattr(self._properties, name)
+      if value == old_value and name in self._notified_properties:
+        return  # Listeners already have this value.
+      self._notified_properties.add(name)
       if value != old_value:
-        setattr(self._properties, name, value)
+        self._properties = replace(self._properties, **{name: value})
+        self._properties_version += 1
         # logging.debug('Updated properties: %s' % self._properties)
         if name == 't_control_value':
           self._update_controlled_properties(value)
       self._notify_listeners(name, notify_value)
 
+  def reset_notified_properties(self) -> None:
+    """Makes the next report of each property reach the listeners, even if unchanged."""
+    with self._properties_lock:
+      self._notified_properties.clear()
+
   def _update_controlled_properties(self, control: int):
     raise NotImplementedError()
 
   def get_command_seq_no(self) -> int:
-    with self._commands_seq_no_lock:
-      seq_no = self._commands_seq_no
-      self._commands_seq_no += 1
-      return seq_no
+    return next(self._commands_seq_no)
 
   def is_update_valid(self, cur_update_no: int) -> bool:
     with self._updates_seq_no_lock:
@@ -149,20 +177,14 @@ class Device(object):
       self._updates_seq_no = cur_update_no
       return True
 
+  def pop_command(self) -> Optional[Command]:
+    """Pops the most urgent pending command (or None if there is none)."""
+    return heapq.heappop(self.commands_queue) if self.commands_queue else None
+
   def queue_command(self, name: str, value) -> None:
     if self._properties.get_read_only(name):
       raise Error('Cannot update read-only property "{}".'.format(name))
-    data_type = self._properties.get_type(name)
-
-    # Device mode is set using t_control_value
-    if issubclass(data_type, enum.Enum):
-      data_value = data_type[value]
-    elif data_type is int and type(value) is str and '.' in value:
-      # Round rather than fail if the input is a float.
-      # This is commonly the case for temperatures converted by HA from Celsius.
-      data_value = round(float(value))
-    else:
-      data_value = data_type(value)
+    data_value = self._properties.coerce(name, value)
 
     # If device has set t_control_value it is being controlled by this field.
     if name != 't_control_value' and self.get_property('t_control_value') and name != 't_sleep':
@@ -170,9 +192,8 @@ class Device(object):
       return
 
     typed_value = data_value
-    if issubclass(data_type, enum.Enum):
+    if self._properties.is_enum(name):
       data_value = data_value.value
-      typed_value = data_type[value]
 
     # Update value precision for value to be sent to the A/C
     precision = self._properties.get_precision(name)
@@ -184,7 +205,7 @@ class Device(object):
     # property, to be run once the command is sent.
     property_updater = lambda: self.update_property(name, typed_value)
     # Add as a high priority command.
-    self.commands_queue.put_nowait(Command(10, time.time_ns(), command, property_updater))
+    heapq.heappush(self.commands_queue, Command(10, time.time_ns(), command, property_updater))
 
     self._queue_listener()
 
@@ -196,7 +217,7 @@ class Device(object):
                 'base_type': base_type,
                 'name': name,
                 'value': data_value,
-                'id': ''.join(random.choices(string.ascii_letters + string.digits, k=8)),
+                'id': ''.join(random.choices(_COMMAND_ID_ALPHABET, k=8)),
             }
         }]
     }
@@ -205,12 +226,14 @@ class Device(object):
     raise NotImplementedError()
 
   def queue_status(self) -> None:
-    for data_field in fields(self._properties):
+    # A full sweep republishes every property, e.g. for listeners that restarted since.
+    self.reset_notified_properties()
+    for resource in self._status_resources:
       command = {
           'cmds': [{
               'cmd': {
                   'method': 'GET',
-                  'resource': 'property.json?name=' + data_field.name,
+                  'resource': resource,
                   'uri': '/local_lan/property/datapoint.json',
                   'data': '',
                   'cmd_id': self._next_command_id,
@@ -219,7 +242,7 @@ class Device(object):
       }
       self._next_command_id += 1
       # Add as a lower-priority command.
-      self.commands_queue.put_nowait(Command(100, time.time_ns(), command, None))
+      heapq.heappush(self.commands_queue, Command(100, time.time_ns(), command, None))
     self._queue_listener()
 
   def update_key(self, key: dict) -> dict:
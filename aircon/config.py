@@ -1,13 +1,22 @@
 from Crypto.Cipher import AES
+try:
+  from Crypto.Util._cpu_features import have_aes_ni
+except ImportError:
+  have_aes_ni = None
 from dataclasses import dataclass
+import hashlib
 import hmac
-import random
-import string
+import secrets
 import time
 
 from .error import KeyIdReplaced
 
 
+def has_aes_ni() -> bool:
+  """Whether AES can run on the CPU's AES-NI instructions (True if unknown)."""
+  return bool(have_aes_ni()) if have_aes_ni else True
+
+
 @dataclass
 class LanConfig:
   lanip_key: str
@@ -26,18 +35,28 @@ class Encryption:
   cipher: AES
 
   def __init__(self, lanip_key: bytes, msg: bytes):
-    self.sign_key = self._build_key(lanip_key, msg + b'0')
-    self.crypto_key = self._build_key(lanip_key, msg + b'1')
-    self.iv_seed = self._build_key(lanip_key, msg + b'2')[:AES.block_size]
-    self.cipher = AES.new(self.crypto_key, AES.MODE_CBC, self.iv_seed)
+    # Keyed once, and copied for each of the derivation digests.
+    lanip_hmac = hmac.new(lanip_key, digestmod=hashlib.sha256)
+    self.sign_key = self._build_key(lanip_hmac, msg + b'0')
+    self.crypto_key = self._build_key(lanip_hmac, msg + b'1')
+    self.iv_seed = self._build_key(lanip_hmac, msg + b'2')[:AES.block_size]
+    self.cipher = AES.new(self.crypto_key, AES.MODE_CBC, self.iv_seed, use_aesni=True)
+    # Keyed once, and copied per message to skip the key padding work.
+    self._sign_hmac = hmac.new(self.sign_key, digestmod=hashlib.sha256)
 
-  @classmethod
-  def _build_key(cls, lanip_key: bytes, msg: bytes) -> bytes:
-    return cls.hmac_digest(lanip_key, cls.hmac_digest(lanip_key, msg) + msg)
+  def sign(self, msg: bytes) -> bytes:
+    """HMAC-SHA256 signature of msg with the sign_key."""
+    signer = self._sign_hmac.copy()
+    signer.update(msg)
+    return signer.digest()
 
   @staticmethod
-  def hmac_digest(key: bytes, msg: bytes) -> bytes:
-    return hmac.digest(key, msg, 'sha256')
+  def _build_key(lanip_hmac, msg: bytes) -> bytes:
+    inner = lanip_hmac.copy()
+    inner.update(msg)
+    outer = lanip_hmac.copy()
+    outer.update(inner.digest() + msg)
+    return outer.digest()
 
 
 @dataclass
@@ -58,8 +77,8 @@ class Config:
       raise KeyIdReplaced(
           'The key_id has been replaced!!',
           'Old ID was {}; new ID is {}.'.format(self._lan_config.lanip_key_id, key['key_id']))
-    self._lan_config.random_2 = ''.join(random.choices(string.ascii_letters + string.digits, k=16))
-    self._lan_config.time_2 = time.monotonic_ns() % 2**40
+    self._lan_config.random_2 = secrets.token_hex(8)
+    self._lan_config.time_2 = time.monotonic_ns() & 0xFFFFFFFFFF  # Low 40 bits.
     self._update_encryption()
     return {'random_2': self._lan_config.random_2, 'time_2': self._lan_config.time_2}
 
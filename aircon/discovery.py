@@ -7,6 +7,7 @@ import logging
 import ssl
 import sys
 
+from . import json_utils
 from .app_mappings import *
 
 _USER_AGENT = 'Dalvik/2.1.0 (Linux; U; Android 9.0; SM-G850F Build/LRX22G)'
@@ -33,10 +34,11 @@ async def _sign_in(user: str, passwd: str, user_server: str, app_id: str, app_se
       'Host': user_server,
       'Accept-Encoding': 'gzip'
   }
-  logging.debug('POST /users/sign_in.json, body=%r, headers=%r', json.dumps(query), headers)
+  body = json_utils.dumps(query)
+  logging.debug('POST /users/sign_in.json, body=%r, headers=%r', body, headers)
   async with session.request('POST',
                              f'https://{user_server}/users/sign_in.json',
-                             json=query,
+                             data=body,
                              headers=headers,
                              ssl=ssl_context) as resp:
     if resp.status != HTTPStatus.OK.value:
@@ -115,8 +117,7 @@ async def perform_discovery(session: aiohttp.ClientSession,
   else:
     app_id = '-'.join((app_prefix, 'id'))
 
-  secret = base64.b64encode(SECRET_MAP[app]).decode('utf-8').rstrip('=').replace('+', '-').replace(
-      '/', '_')
+  secret = base64.urlsafe_b64encode(SECRET_MAP[app]).rstrip(b'=').decode('ascii')
   app_secret = '-'.join((app_prefix, secret))
 
   # Extract the region from the app ID (and fallback to US)
@@ -126,10 +127,9 @@ async def perform_discovery(session: aiohttp.ClientSession,
   user_server = AYLA_USER_SERVERS[region]
   devices_server = AYLA_DEVICES_SERVERS[region]
 
-  ssl_context = ssl.SSLContext()
-  ssl_context.verify_mode = ssl.CERT_NONE
+  ssl_context = ssl.create_default_context()
   ssl_context.check_hostname = False
-  ssl_context.load_default_certs()
+  ssl_context.verify_mode = ssl.CERT_NONE
 
   access_token = await _sign_in(user, passwd, user_server, app_id, app_secret, session, ssl_context)
 
@@ -0,0 +1,18 @@
+"""JSON (de)serialization helpers, backed by orjson when it is installed."""
+import json
+
+try:
+  import orjson
+except ImportError:
+  orjson = None
+
+if orjson:
+  dumps = orjson.dumps
+  loads = orjson.loads
+else:
+
+  def dumps(obj) -> bytes:
+    """Serializes obj to compact, UTF-8 encoded JSON."""
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+  loads = json.loads
@@ -1,4 +1,4 @@
-from dataclasses import fields
+import asyncio
 import enum
 import logging
 import paho.mqtt.client as mqtt
@@ -6,6 +6,29 @@ import paho.mqtt.client as mqtt
 from .aircon import Device
 from .properties import AcWorkMode, FglOperationMode
 
+# HomeAssistant names the fan work mode 'fan_only'.
+_FAN_MODES = (AcWorkMode.FAN, FglOperationMode.FAN)
+_COMMAND_PAYLOADS = {
+    ('t_work_mode', b'fan_only'): 'FAN',
+    ('operation_mode', b'fan_only'): 'FAN',
+}
+
+_ENUM_PAYLOADS = {}  # Enum class -> {member: payload}, filled on first use.
+
+
+def _enum_payload(value: enum.Enum) -> bytes:
+  # Keyed by class first, as IntEnum members of different classes compare equal.
+  payloads = _ENUM_PAYLOADS.get(type(value))
+  if payloads is None:
+    payloads = {}
+    for member in type(value):
+      if any(member is mode for mode in _FAN_MODES):  # Identity, as IntEnum 0s compare equal.
+        payloads[member] = b'fan_only'
+      else:
+        payloads[member] = member.name.lower().encode('utf-8')
+    _ENUM_PAYLOADS[type(value)] = payloads
+  return payloads[value]
+
 
 class MqttClient(mqtt.Client):
 
@@ -14,59 +37,94 @@ class MqttClient(mqtt.Client):
     self._mqtt_topics = mqtt_topics
     self._devices = devices
 
+    # Topics are fixed per device and property, so they are formatted once.
+    self._pub_topics = {}  # (mac_address, prop_name) -> status topic
+    self._pub_targets = {}  # status topic -> (device, prop_name)
+    self._sub_targets = {}  # command topic -> (device, prop_name)
+    for device in devices:
+      for prop_name in device.get_property_names():
+        pub_topic = mqtt_topics['pub'].format(device.mac_address, prop_name)
+        self._pub_topics[(device.mac_address, prop_name)] = pub_topic
+        self._pub_targets[pub_topic] = (device, prop_name)
+        sub_topic = mqtt_topics['sub'].format(device.mac_address, prop_name)
+        self._sub_targets[sub_topic] = (device, prop_name)
+
     self.on_connect = self.mqtt_on_connect
     self.on_message = self.mqtt_on_message
+    self._event_loop = None
+
+  def attach_to_event_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+    """Drives the network I/O from the event loop, as soon as the socket is ready.
+
+    Must be called before connecting. misc_loop() should run alongside, for keepalives.
+    """
+    self._event_loop = loop
+    self.on_socket_open = self._aio_socket_open
+    self.on_socket_close = self._aio_socket_close
+    self.on_socket_register_write = self._aio_socket_register_write
+    self.on_socket_unregister_write = self._aio_socket_unregister_write
+
+  def _aio_socket_open(self, client: mqtt.Client, userdata, sock):
+    self._event_loop.add_reader(sock, client.loop_read)
+
+  def _aio_socket_close(self, client: mqtt.Client, userdata, sock):
+    self._event_loop.remove_reader(sock)
+
+  def _aio_socket_register_write(self, client: mqtt.Client, userdata, sock):
+    self._event_loop.add_writer(sock, client.loop_write)
+
+  def _aio_socket_unregister_write(self, client: mqtt.Client, userdata, sock):
+    self._event_loop.remove_writer(sock)
+
+  async def misc_loop(self):
+    """Runs the periodic MQTT housekeeping (e.g. keepalive pings)."""
+    _MISC_LOOP_INTERVAL = 1
+    while True:
+      self.loop_misc()
+      await asyncio.sleep(_MISC_LOOP_INTERVAL)
 
   def mqtt_on_connect(self, client: mqtt.Client, userdata, flags, rc):
-    for device in self._devices:
-      client.subscribe([(self._mqtt_topics['sub'].format(device.mac_address, data_field.name), 0)
-                        for data_field in fields(device.get_all_properties())])
+    client.subscribe([(topic, 0) for topic in self._sub_targets])
     # Subscribe to subscription updates.
     client.subscribe('$SYS/broker/log/M/subscribe/#')
 
     # Publish current status of all properties for available devices.
     for device in self._devices:
+      # The state isn't retained, so a reconnected broker needs the next reports too.
+      device.reset_notified_properties()
       if device.available:
-        for prop_name in fields(device.get_all_properties()):
+        for prop_name in device.get_property_names():
           self.mqtt_publish_update(device.mac_address,
                                    prop_name,
                                    device.get_property(prop_name),
                                    retain=False)
 
   def mqtt_on_message(self, client: mqtt.Client, userdata, message: mqtt.MQTTMessage):
-    logging.info('MQTT message Topic: {}, Payload {}'.format(message.topic, message.payload))
-    if message.topic.startswith('$SYS/broker/log/M/subscribe'):
-      return self.mqtt_on_subscribe(message.payload)
-    mac_address = message.topic.rsplit('/', 3)[1]
-    prop_name = message.topic.rsplit('/', 3)[2]
-    payload = message.payload.decode('utf-8')
-    if prop_name == 't_work_mode':
-      if payload == 'fan_only':
-        payload = 'FAN'
-
-    for device in self._devices:
-      if device.mac_address != mac_address:
-        continue
-      chosen_device = device
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+      logging.debug('MQTT message Topic: %s, Payload %s', message.topic, message.payload)
+    target = self._sub_targets.get(message.topic)
+    if not target:
+      # Only commands are expected often, so subscription logs are checked second.
+      if message.topic.startswith('$SYS/broker/log/M/subscribe'):
+        return self.mqtt_on_subscribe(message.payload)
+      logging.warning('Unexpected MQTT topic %s', message.topic)
+      return
+    chosen_device, prop_name = target
+    payload = (_COMMAND_PAYLOADS.get((prop_name, message.payload)) or
+               message.payload.upper().decode('utf-8'))
 
     try:
-      chosen_device.queue_command(prop_name, payload.upper())
+      chosen_device.queue_command(prop_name, payload)
     except Exception:
-      logging.exception('Failed to parse value {} for property {}'.format(
-          payload.upper(), prop_name))
+      logging.exception('Failed to parse value {} for property {}'.format(payload, prop_name))
 
   def mqtt_on_subscribe(self, payload: bytes):
     # The last segment in the space delimited string is the topic.
     topic = payload.decode('utf-8').rsplit(' ', 1)[-1]
-    if topic not in self._mqtt_topics['pub']:
+    target = self._pub_targets.get(topic)
+    if not target:
       return
-    mac_address = topic.rsplit('/', 3)[1]
-    prop_name = topic.rsplit('/', 3)[2]
-
-    for device in self._devices:
-      if device.mac_address != mac_address:
-        continue
-      chosen_device = device
+    chosen_device, prop_name = target
 
     self.mqtt_publish_update(chosen_device.mac_address,
                              prop_name,
@@ -79,10 +137,10 @@ class MqttClient(mqtt.Client):
                           value,
                           retain: bool = False) -> None:
     if isinstance(value, enum.Enum):
-      payload = 'fan_only' if (value is AcWorkMode.FAN or
-                               value is FglOperationMode.FAN) else value.name.lower()
+      payload = _enum_payload(value)
     else:
-      payload = str(value)
-    self.publish(self._mqtt_topics['pub'].format(mac_address, property_name),
-                 payload=payload.encode('utf-8'),
-                 retain=retain)
+      payload = str(value).encode('utf-8')
+    topic = self._pub_topics.get((mac_address, property_name))
+    if topic is None:  # Not a property, e.g. the device availability.
+      topic = self._mqtt_topics['pub'].format(mac_address, property_name)
+    self.publish(topic, payload=payload, retain=retain)
@@ -3,7 +3,6 @@ import asyncio
 import concurrent
 from dataclasses import dataclass
 from http import HTTPStatus
-import json
 import logging
 import socket
 import sys
@@ -11,6 +10,7 @@ from tenacity import retry, retry_if_exception_type, wait_exponential, stop_afte
 import time
 import threading
 
+from . import json_utils
 from .aircon import Device
 
 if sys.version_info < (3, 8):
@@ -43,7 +43,15 @@ class Notifier:
     self._running = False
 
     local_ip = local_ip or self._get_local_ip()
-    self._json = {'local_reg': {'ip': local_ip, 'notify': 0, 'port': port, 'uri': '/local_lan'}}
+    # The local_reg body only varies by the notify flag, so both variants are serialized once.
+    self._bodies = tuple(
+        json_utils.dumps(
+            {'local_reg': {
+                'ip': local_ip,
+                'notify': notify,
+                'port': port,
+                'uri': '/local_lan'
+            }}) for notify in (0, 1))
 
   def _get_local_ip(self):
     sock = None
@@ -102,16 +110,17 @@ class Notifier:
   async def _perform_request(self, session: aiohttp.ClientSession,
                              config: _NotifyConfiguration) -> int:
     now = time.time()
-    queue_size = config.device.commands_queue.qsize()
+    queue_size = len(config.device.commands_queue)
     if (queue_size == 0 or
         not config.device.available) and now - config.last_timestamp < self._KEEP_ALIVE_INTERVAL:
       return 0
     method = 'PUT' if config.device.available else 'POST'
-    self._json['local_reg']['notify'] = int(config.device.commands_queue.qsize() > 0)
+    body = self._bodies[int(queue_size > 0)]
     url = f'http://{config.device.ip_address}/local_reg.json'
-    logging.debug(f'[KeepAlive] Sending {method} {url} {json.dumps(self._json)}')
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+      logging.debug('[KeepAlive] Sending %s %s %s', method, url, body.decode('utf-8'))
     try:
-      async with session.request(method, url, json=self._json, headers=config.headers) as resp:
+      async with session.request(method, url, data=body, headers=config.headers) as resp:
         if resp.status != HTTPStatus.ACCEPTED.value:
           resp_data = await resp.text()
           logging.error(f'[KeepAlive] Sending local_reg failed: {resp.status}, {resp_data}')
@@ -1,6 +1,15 @@
-from dataclasses import dataclass, field
-from dataclasses_json import dataclass_json
+from dataclasses import dataclass, field, fields
 import enum
+from types import MappingProxyType
+from typing import Callable
+
+# Shared metadata for the plain (non-enum) fields. Read-only views, as the same
+# mapping is used by many fields.
+_BOOL_RO = MappingProxyType({'base_type': 'boolean', 'read_only': True})
+_BOOL_RW = MappingProxyType({'base_type': 'boolean', 'read_only': False})
+_INT_RO = MappingProxyType({'base_type': 'integer', 'read_only': True})
+_INT_RW = MappingProxyType({'base_type': 'integer', 'read_only': False})
+_DEC_RO = MappingProxyType({'base_type': 'decimal', 'read_only': True})
 
 
 class AirFlowState(enum.IntEnum):
@@ -47,51 +56,32 @@ class AcWorkMode(enum.IntEnum):
   AUTO = 4
 
 
-class AirFlow(enum.Enum):
+class OnOff(enum.IntEnum):
   OFF = 0
   ON = 1
 
 
-class DeviceErrorStatus(enum.Enum):
+# Two-state properties sharing the plain OFF/ON encoding.
+AirFlow = OnOff
+DoubleFrequency = OnOff
+Economy = OnOff
+EightHeat = OnOff
+FastColdHeat = OnOff
+MistState = OnOff
+Power = OnOff
+Quiet = OnOff
+
+
+class DeviceErrorStatus(enum.IntEnum):
   NORMALSTATE = 0
   FAULTSTATE = 1
 
 
-class Dimmer(enum.Enum):
+class Dimmer(enum.IntEnum):
   ON = 0
   OFF = 1
 
 
-class DoubleFrequency(enum.Enum):
-  OFF = 0
-  ON = 1
-
-
-class Economy(enum.Enum):
-  OFF = 0
-  ON = 1
-
-
-class EightHeat(enum.Enum):
-  OFF = 0
-  ON = 1
-
-
-class FastColdHeat(enum.Enum):
-  OFF = 0
-  ON = 1
-
-
-class Power(enum.Enum):
-  OFF = 0
-  ON = 1
-
-
-class Quiet(enum.Enum):
-  OFF = 0
-  ON = 1
-
-
 class TemperatureUnit(enum.Enum):
   CELSIUS = 0
   FAHRENHEIT = 1
@@ -103,7 +93,7 @@ class HumidifierWorkMode(enum.Enum):
   SLEEP = 2
 
 
-class HumidifierWater(enum.Enum):
+class HumidifierWater(enum.IntEnum):
   OK = 0
   NO_WATER = 1
 
@@ -114,11 +104,6 @@ class Mist(enum.Enum):
   BIG = 3
 
 
-class MistState(enum.Enum):
-  OFF = 0
-  ON = 1
-
-
 class FglOperationMode(enum.IntEnum):
   OFF = 0
   ON = 1
@@ -143,263 +128,167 @@ class Properties(object):
   def _get_metadata(cls, attr: str):
     return cls.__dataclass_fields__[attr].metadata
 
+  @classmethod
+  def get_names(cls) -> tuple:
+    return cls._FIELD_NAMES
+
   @classmethod
   def get_type(cls, attr: str):
-    return cls.__dataclass_fields__[attr].type
+    return cls._TYPES[attr]
 
   @classmethod
   def get_base_type(cls, attr: str):
-    return cls._get_metadata(attr)['base_type']
+    return cls._BASE_TYPES[attr]
 
   @classmethod
   def get_precision(cls, attr: str):
-    return cls._get_metadata(attr).get('precision', 1)
+    return cls._PRECISIONS[attr]
 
   @classmethod
   def get_read_only(cls, attr: str):
-    return cls._get_metadata(attr)['read_only']
+    return cls._READ_ONLY[attr]
 
+  @classmethod
+  def is_enum(cls, attr: str) -> bool:
+    return cls._IS_ENUM[attr]
 
-@dataclass_json
-@dataclass
+  @classmethod
+  def coerce(cls, attr: str, value):
+    """Converts a command value (e.g. from MQTT or HTTP) to the property's type."""
+    return cls._COERCERS[attr](value)
+
+
+def _coerce_int(value) -> int:
+  if type(value) is str and '.' in value:
+    # Round rather than fail if the input is a float.
+    # This is commonly the case for temperatures converted by HA from Celsius.
+    return round(float(value))
+  return int(value)
+
+
+def _coercer(data_type, is_enum: bool) -> Callable:
+  """Returns the function converting a command value to data_type."""
+  if is_enum:
+    return data_type.__getitem__
+  elif data_type is int:
+    return _coerce_int
+  else:
+    return data_type
+
+
+def _enum_field(default: enum.Enum, base_type: str, read_only: bool = False):
+  """Builds a dataclass field holding an enum (encoded by name in to_dict())."""
+  return field(default=default, metadata={'base_type': base_type, 'read_only': read_only})
+
+
+def _build_to_dict(cls):
+  """Generates a to_dict() method for a Properties dataclass.
+
+  The generated code writes all fields in a single dict display, with enum
+  fields encoded by name, instead of walking the fields at runtime.
+  """
+  items = []
+  for name in cls._FIELD_NAMES:
+    if cls._IS_ENUM[name]:
+      items.append(f"'{name}': self.{name}.name")
+    else:
+      items.append(f"'{name}': self.{name}")
+  source = f'def to_dict(self):\n  return {{{", ".join(items)}}}\n'
+  namespace = {}
+  exec(source, namespace)
+  return namespace['to_dict']
+
+
+def _finalize_properties(cls):
+  """Class decorator attaching the generated helpers to a Properties dataclass."""
+  cls._TYPES = {data_field.name: data_field.type for data_field in fields(cls)}
+  cls._FIELD_NAMES = tuple(cls._TYPES)
+  cls._BASE_TYPES = {name: cls._get_metadata(name)['base_type'] for name in cls._TYPES}
+  cls._PRECISIONS = {name: cls._get_metadata(name).get('precision', 1) for name in cls._TYPES}
+  cls._READ_ONLY = {name: cls._get_metadata(name)['read_only'] for name in cls._TYPES}
+  cls._IS_ENUM = {
+      name: isinstance(data_type, type) and issubclass(data_type, enum.Enum)
+      for name, data_type in cls._TYPES.items()
+  }
+  cls._COERCERS = {
+      name: _coercer(data_type, cls._IS_ENUM[name]) for name, data_type in cls._TYPES.items()
+  }
+  cls.to_dict = _build_to_dict(cls)
+  return cls
+
+
+@_finalize_properties
+@dataclass(frozen=True)
 class AcProperties(Properties):
-  # ack_cmd: bool = field(default=None, metadata={'base_type': 'boolean', 'read_only': False})
-  f_electricity: int = field(default=100, metadata={'base_type': 'integer', 'read_only': True})
-  f_e_arkgrille: bool = field(default=0, metadata={'base_type': 'boolean', 'read_only': True})
-  f_e_incoiltemp: bool = field(default=0, metadata={'base_type': 'boolean', 'read_only': True})
-  f_e_incom: bool = field(default=0, metadata={'base_type': 'boolean', 'read_only': True})
-  f_e_indisplay: bool = field(default=0, metadata={'base_type': 'boolean', 'read_only': True})
-  f_e_ineeprom: bool = field(default=0, metadata={'base_type': 'boolean', 'read_only': True})
-  f_e_inele: bool = field(default=0, metadata={'base_type': 'boolean', 'read_only': True})
-  f_e_infanmotor: bool = field(default=0, metadata={'base_type': 'boolean', 'read_only': True})
-  f_e_inhumidity: bool = field(default=0, metadata={'base_type': 'boolean', 'read_only': True})
-  f_e_inkeys: bool = field(default=0, metadata={'base_type': 'boolean', 'read_only': True})
-  f_e_inlow: bool = field(default=0, metadata={'base_type': 'boolean', 'read_only': True})
-  f_e_intemp: bool = field(default=0, metadata={'base_type': 'boolean', 'read_only': True})
-  f_e_invzero: bool = field(default=0, metadata={'base_type': 'boolean', 'read_only': True})
-  f_e_outcoiltemp: bool = field(default=0, metadata={'base_type': 'boolean', 'read_only': True})
-  f_e_outeeprom: bool = field(default=0, metadata={'base_type': 'boolean', 'read_only': True})
-  f_e_outgastemp: bool = field(default=0, metadata={'base_type': 'boolean', 'read_only': True})
-  f_e_outmachine2: bool = field(default=0, metadata={'base_type': 'boolean', 'read_only': True})
-  f_e_outmachine: bool = field(default=0, metadata={'base_type': 'boolean', 'read_only': True})
-  f_e_outtemp: bool = field(default=0, metadata={'base_type': 'boolean', 'read_only': True})
-  f_e_outtemplow: bool = field(default=0, metadata={'base_type': 'boolean', 'read_only': True})
-  f_e_push: bool = field(default=0, metadata={'base_type': 'boolean', 'read_only': True})
-  f_filterclean: bool = field(default=0, metadata={'base_type': 'boolean', 'read_only': True})
-  f_humidity: int = field(default=50, metadata={
-      'base_type': 'integer',
-      'read_only': True
-  })  # Humidity
-  f_power_display: bool = field(default=0, metadata={'base_type': 'boolean', 'read_only': True})
-  f_temp_in: float = field(default=81.0, metadata={
-      'base_type': 'decimal',
-      'read_only': True
-  })  # EnvironmentTemperature (Fahrenheit)
-  f_voltage: int = field(default=0, metadata={'base_type': 'integer', 'read_only': True})
-  t_backlight: Dimmer = field(default=Dimmer.OFF,
-                              metadata={
-                                  'base_type': 'boolean',
-                                  'read_only': False,
-                                  'dataclasses_json': {
-                                      'encoder': lambda x: x.name,
-                                      'decoder': lambda x: Dimmer[x]
-                                  }
-                              })  # DimmerStatus
-  t_control_value: int = field(default=None, metadata={'base_type': 'integer', 'read_only': False})
-  t_device_info: bool = field(default=0, metadata={'base_type': 'boolean', 'read_only': False})
-  t_display_power: bool = field(default=None, metadata={'base_type': 'boolean', 'read_only': False})
-  t_eco: Economy = field(default=Economy.OFF,
-                         metadata={
-                             'base_type': 'boolean',
-                             'read_only': False,
-                             'dataclasses_json': {
-                                 'encoder': lambda x: x.name,
-                                 'decoder': lambda x: Economy[x]
-                             }
-                         })
-  t_fan_leftright: AirFlow = field(default=AirFlow.OFF,
-                                   metadata={
-                                       'base_type': 'boolean',
-                                       'read_only': False,
-                                       'dataclasses_json': {
-                                           'encoder': lambda x: x.name,
-                                           'decoder': lambda x: AirFlow[x]
-                                       }
-                                   })  # HorizontalAirFlow
-  t_fan_mute: Quiet = field(default=Quiet.OFF,
-                            metadata={
-                                'base_type': 'boolean',
-                                'read_only': False,
-                                'dataclasses_json': {
-                                    'encoder': lambda x: x.name,
-                                    'decoder': lambda x: Quiet[x]
-                                }
-                            })  # QuietModeStatus
-  t_fan_power: AirFlow = field(default=AirFlow.OFF,
-                               metadata={
-                                   'base_type': 'boolean',
-                                   'read_only': False,
-                                   'dataclasses_json': {
-                                       'encoder': lambda x: x.name,
-                                       'decoder': lambda x: AirFlow[x]
-                                   }
-                               })  # VerticalAirFlow
-  t_fan_speed: FanSpeed = field(default=FanSpeed.AUTO,
-                                metadata={
-                                    'base_type': 'integer',
-                                    'read_only': False,
-                                    'dataclasses_json': {
-                                        'encoder': lambda x: x.name,
-                                        'decoder': lambda x: FanSpeed[x]
-                                    }
-                                })  # FanSpeed
-  t_ftkt_start: int = field(default=None, metadata={'base_type': 'integer', 'read_only': False})
-  t_power: Power = field(default=Power.ON,
-                         metadata={
-                             'base_type': 'boolean',
-                             'read_only': False,
-                             'dataclasses_json': {
-                                 'encoder': lambda x: x.name,
-                                 'decoder': lambda x: Power[x]
-                             }
-                         })  # PowerStatus
-  t_run_mode: DoubleFrequency = field(default=DoubleFrequency.OFF,
-                                      metadata={
-                                          'base_type': 'boolean',
-                                          'read_only': False,
-                                          'dataclasses_json': {
-                                              'encoder': lambda x: x.name,
-                                              'decoder': lambda x: DoubleFrequency[x]
-                                          }
-                                      })  # DoubleFrequency
-  t_setmulti_value: int = field(default=None, metadata={'base_type': 'integer', 'read_only': False})
-  t_sleep: SleepMode = field(default=SleepMode.STOP,
-                             metadata={
-                                 'base_type': 'integer',
-                                 'read_only': False,
-                                 'dataclasses_json': {
-                                     'encoder': lambda x: x.name,
-                                     'decoder': lambda x: SleepMode[x]
-                                 }
-                             })  # SleepMode
-  t_temp: int = field(default=81, metadata={
-      'base_type': 'integer',
-      'read_only': False
-  })  # CurrentTemperature
-  t_temptype: TemperatureUnit = field(default=TemperatureUnit.FAHRENHEIT,
-                                      metadata={
-                                          'base_type': 'boolean',
-                                          'read_only': False,
-                                          'dataclasses_json': {
-                                              'encoder': lambda x: x.name,
-                                              'decoder': lambda x: TemperatureUnit[x]
-                                          }
-                                      })  # CurrentTemperatureUnit
-  t_temp_eight: EightHeat = field(default=EightHeat.OFF,
-                                  metadata={
-                                      'base_type': 'boolean',
-                                      'read_only': False,
-                                      'dataclasses_json': {
-                                          'encoder': lambda x: x.name,
-                                          'decoder': lambda x: EightHeat[x]
-                                      }
-                                  })  # EightHeatStatus
-  t_temp_heatcold: FastColdHeat = field(default=FastColdHeat.OFF,
-                                        metadata={
-                                            'base_type': 'boolean',
-                                            'read_only': False,
-                                            'dataclasses_json': {
-                                                'encoder': lambda x: x.name,
-                                                'decoder': lambda x: FastColdHeat[x]
-                                            }
-                                        })  # FastCoolHeatStatus
-  t_work_mode: AcWorkMode = field(default=AcWorkMode.AUTO,
-                                  metadata={
-                                      'base_type': 'integer',
-                                      'read_only': False,
-                                      'dataclasses_json': {
-                                          'encoder': lambda x: x.name,
-                                          'decoder': lambda x: AcWorkMode[x]
-                                      }
-                                  })  # WorkModeStatus
-
-
-@dataclass_json
-@dataclass
+  # ack_cmd: bool = field(default=None, metadata=_BOOL_RW)
+  f_electricity: int = field(default=100, metadata=_INT_RO)
+  f_e_arkgrille: bool = field(default=0, metadata=_BOOL_RO)
+  f_e_incoiltemp: bool = field(default=0, metadata=_BOOL_RO)
+  f_e_incom: bool = field(default=0, metadata=_BOOL_RO)
+  f_e_indisplay: bool = field(default=0, metadata=_BOOL_RO)
+  f_e_ineeprom: bool = field(default=0, metadata=_BOOL_RO)
+  f_e_inele: bool = field(default=0, metadata=_BOOL_RO)
+  f_e_infanmotor: bool = field(default=0, metadata=_BOOL_RO)
+  f_e_inhumidity: bool = field(default=0, metadata=_BOOL_RO)
+  f_e_inkeys: bool = field(default=0, metadata=_BOOL_RO)
+  f_e_inlow: bool = field(default=0, metadata=_BOOL_RO)
+  f_e_intemp: bool = field(default=0, metadata=_BOOL_RO)
+  f_e_invzero: bool = field(default=0, metadata=_BOOL_RO)
+  f_e_outcoiltemp: bool = field(default=0, metadata=_BOOL_RO)
+  f_e_outeeprom: bool = field(default=0, metadata=_BOOL_RO)
+  f_e_outgastemp: bool = field(default=0, metadata=_BOOL_RO)
+  f_e_outmachine2: bool = field(default=0, metadata=_BOOL_RO)
+  f_e_outmachine: bool = field(default=0, metadata=_BOOL_RO)
+  f_e_outtemp: bool = field(default=0, metadata=_BOOL_RO)
+  f_e_outtemplow: bool = field(default=0, metadata=_BOOL_RO)
+  f_e_push: bool = field(default=0, metadata=_BOOL_RO)
+  f_filterclean: bool = field(default=0, metadata=_BOOL_RO)
+  f_humidity: int = field(default=50, metadata=_INT_RO)  # Humidity
+  f_power_display: bool = field(default=0, metadata=_BOOL_RO)
+  f_temp_in: float = field(default=81.0, metadata=_DEC_RO)  # EnvironmentTemperature (Fahrenheit)
+  f_voltage: int = field(default=0, metadata=_INT_RO)
+  t_backlight: Dimmer = _enum_field(Dimmer.OFF, 'boolean')  # DimmerStatus
+  t_control_value: int = field(default=None, metadata=_INT_RW)
+  t_device_info: bool = field(default=0, metadata=_BOOL_RW)
+  t_display_power: bool = field(default=None, metadata=_BOOL_RW)
+  t_eco: Economy = _enum_field(Economy.OFF, 'boolean')
+  t_fan_leftright: AirFlow = _enum_field(AirFlow.OFF, 'boolean')  # HorizontalAirFlow
+  t_fan_mute: Quiet = _enum_field(Quiet.OFF, 'boolean')  # QuietModeStatus
+  t_fan_power: AirFlow = _enum_field(AirFlow.OFF, 'boolean')  # VerticalAirFlow
+  t_fan_speed: FanSpeed = _enum_field(FanSpeed.AUTO, 'integer')  # FanSpeed
+  t_ftkt_start: int = field(default=None, metadata=_INT_RW)
+  t_power: Power = _enum_field(Power.ON, 'boolean')  # PowerStatus
+  t_run_mode: DoubleFrequency = _enum_field(DoubleFrequency.OFF, 'boolean')  # DoubleFrequency
+  t_setmulti_value: int = field(default=None, metadata=_INT_RW)
+  t_sleep: SleepMode = _enum_field(SleepMode.STOP, 'integer')  # SleepMode
+  t_temp: int = field(default=81, metadata=_INT_RW)  # CurrentTemperature
+  t_temptype: TemperatureUnit = _enum_field(TemperatureUnit.FAHRENHEIT,
+                                            'boolean')  # CurrentTemperatureUnit
+  t_temp_eight: EightHeat = _enum_field(EightHeat.OFF, 'boolean')  # EightHeatStatus
+  t_temp_heatcold: FastColdHeat = _enum_field(FastColdHeat.OFF, 'boolean')  # FastCoolHeatStatus
+  t_work_mode: AcWorkMode = _enum_field(AcWorkMode.AUTO, 'integer')  # WorkModeStatus
+
+
+@_finalize_properties
+@dataclass(frozen=True)
 class HumidifierProperties(Properties):
-  humi: int = field(default=0, metadata={'base_type': 'integer', 'read_only': False})
-  mist: Mist = field(default=Mist.SMALL,
-                     metadata={
-                         'base_type': 'integer',
-                         'read_only': False,
-                         'dataclasses_json': {
-                             'encoder': lambda x: x.name,
-                             'decoder': lambda x: Mist[x]
-                         }
-                     })
-  mistSt: MistState = field(default=MistState.OFF,
-                            metadata={
-                                'base_type': 'integer',
-                                'read_only': True,
-                                'dataclasses_json': {
-                                    'encoder': lambda x: x.name,
-                                    'decoder': lambda x: MistState[x]
-                                }
-                            })
-  realhumi: int = field(default=0, metadata={'base_type': 'integer', 'read_only': True})
-  remain: int = field(default=0, metadata={'base_type': 'integer', 'read_only': True})
-  switch: Power = field(default=Power.ON,
-                        metadata={
-                            'base_type': 'boolean',
-                            'read_only': False,
-                            'dataclasses_json': {
-                                'encoder': lambda x: x.name,
-                                'decoder': lambda x: Power[x]
-                            }
-                        })
-  temp: int = field(default=81, metadata={'base_type': 'integer', 'read_only': True})
-  timer: int = field(default=-1, metadata={'base_type': 'integer', 'read_only': False})
-  water: HumidifierWater = field(default=HumidifierWater.OK,
-                                 metadata={
-                                     'base_type': 'boolean',
-                                     'read_only': True,
-                                     'dataclasses_json': {
-                                         'encoder': lambda x: x.name,
-                                         'decoder': lambda x: HumidifierWater[x]
-                                     }
-                                 })
-  workmode: HumidifierWorkMode = field(default=HumidifierWorkMode.NORMAL,
-                                       metadata={
-                                           'base_type': 'integer',
-                                           'read_only': False,
-                                           'dataclasses_json': {
-                                               'encoder': lambda x: x.name,
-                                               'decoder': lambda x: HumidifierWorkMode[x]
-                                           }
-                                       })
-
-
-@dataclass_json
-@dataclass
+  humi: int = field(default=0, metadata=_INT_RW)
+  mist: Mist = _enum_field(Mist.SMALL, 'integer')
+  mistSt: MistState = _enum_field(MistState.OFF, 'integer', read_only=True)
+  realhumi: int = field(default=0, metadata=_INT_RO)
+  remain: int = field(default=0, metadata=_INT_RO)
+  switch: Power = _enum_field(Power.ON, 'boolean')
+  temp: int = field(default=81, metadata=_INT_RO)
+  timer: int = field(default=-1, metadata=_INT_RW)
+  water: HumidifierWater = _enum_field(HumidifierWater.OK, 'boolean', read_only=True)
+  workmode: HumidifierWorkMode = _enum_field(HumidifierWorkMode.NORMAL, 'integer')
+
+
+@_finalize_properties
+@dataclass(frozen=True)
 class FglProperties(Properties):
-  operation_mode: FglOperationMode = field(default=FglOperationMode.AUTO,
-                                           metadata={
-                                               'base_type': 'integer',
-                                               'read_only': False,
-                                               'dataclasses_json': {
-                                                   'encoder': lambda x: x.name,
-                                                   'decoder': lambda x: FglOperationMode[x]
-                                               }
-                                           })
-  fan_speed: FglFanSpeed = field(default=FglFanSpeed.AUTO,
-                                 metadata={
-                                     'base_type': 'integer',
-                                     'read_only': False,
-                                     'dataclasses_json': {
-                                         'encoder': lambda x: x.name,
-                                         'decoder': lambda x: FglFanSpeed[x]
-                                     }
-                                 })
+  operation_mode: FglOperationMode = _enum_field(FglOperationMode.AUTO, 'integer')
+  fan_speed: FglFanSpeed = _enum_field(FglFanSpeed.AUTO, 'integer')
   adjust_temperature: int = field(default=25,
                                   metadata={
                                       'base_type': 'integer',
@@ -412,66 +301,18 @@ class FglProperties(Properties):
                                       'precision': 0.1,
                                       'read_only': True
                                    })
-  af_vertical_direction: int = field(default=3,
-                                     metadata={
-                                         'base_type': 'integer',
-                                         'read_only': False
-                                     })
-  af_vertical_swing: AirFlow = field(default=AirFlow.OFF,
-                                     metadata={
-                                         'base_type': 'boolean',
-                                         'read_only': False,
-                                         'dataclasses_json': {
-                                             'encoder': lambda x: x.name,
-                                             'decoder': lambda x: AirFlow[x]
-                                         }
-                                     })  # HorizontalAirFlow
-  af_horizontal_direction: int = field(default=3,
-                                       metadata={
-                                           'base_type': 'integer',
-                                           'read_only': False
-                                       })
-  af_horizontal_swing: AirFlow = field(default=AirFlow.OFF,
-                                       metadata={
-                                           'base_type': 'boolean',
-                                           'read_only': False,
-                                           'dataclasses_json': {
-                                               'encoder': lambda x: x.name,
-                                               'decoder': lambda x: AirFlow[x]
-                                           }
-                                       })  # HorizontalAirFlow
-  economy_mode: Economy = field(default=Economy.OFF,
-                                metadata={
-                                    'base_type': 'boolean',
-                                    'read_only': False,
-                                    'dataclasses_json': {
-                                        'encoder': lambda x: x.name,
-                                        'decoder': lambda x: Economy[x]
-                                    }
-                                })
-
-
-@dataclass_json
-@dataclass
+  af_vertical_direction: int = field(default=3, metadata=_INT_RW)
+  af_vertical_swing: AirFlow = _enum_field(AirFlow.OFF, 'boolean')  # HorizontalAirFlow
+  af_horizontal_direction: int = field(default=3, metadata=_INT_RW)
+  af_horizontal_swing: AirFlow = _enum_field(AirFlow.OFF, 'boolean')  # HorizontalAirFlow
+  economy_mode: Economy = _enum_field(Economy.OFF, 'boolean')
+
+
+@_finalize_properties
+@dataclass(frozen=True)
 class FglBProperties(Properties):
-  operation_mode: FglOperationMode = field(default=FglOperationMode.AUTO,
-                                           metadata={
-                                               'base_type': 'integer',
-                                               'read_only': False,
-                                               'dataclasses_json': {
-                                                   'encoder': lambda x: x.name,
-                                                   'decoder': lambda x: FglOperationMode[x]
-                                               }
-                                           })
-  fan_speed: FglFanSpeed = field(default=FglFanSpeed.AUTO,
-                                 metadata={
-                                     'base_type': 'integer',
-                                     'read_only': False,
-                                     'dataclasses_json': {
-                                         'encoder': lambda x: x.name,
-                                         'decoder': lambda x: FglFanSpeed[x]
-                                     }
-                                 })
+  operation_mode: FglOperationMode = _enum_field(FglOperationMode.AUTO, 'integer')
+  fan_speed: FglFanSpeed = _enum_field(FglFanSpeed.AUTO, 'integer')
   adjust_temperature: int = field(default=25,
                                   metadata={
                                       'base_type': 'integer',
@@ -484,22 +325,6 @@ class FglBProperties(Properties):
                                       'precision': 0.1,
                                       'read_only': True
                                    })
-  af_vertical_move_step1: int = field(default=3,
-                                      metadata={
-                                          'base_type': 'integer',
-                                          'read_only': False
-                                      })
-  af_horizontal_move_step1: int = field(default=3,
-                                        metadata={
-                                            'base_type': 'integer',
-                                            'read_only': False
-                                        })
-  economy_mode: Economy = field(default=Economy.OFF,
-                                metadata={
-                                    'base_type': 'boolean',
-                                    'read_only': False,
-                                    'dataclasses_json': {
-                                        'encoder': lambda x: x.name,
-                                        'decoder': lambda x: Economy[x]
-                                    }
-                                })
+  af_vertical_move_step1: int = field(default=3, metadata=_INT_RW)
+  af_horizontal_move_step1: int = field(default=3, metadata=_INT_RW)
+  economy_mode: Economy = _enum_field(Economy.OFF, 'boolean')
@@ -1,20 +1,29 @@
 from aiohttp import web
-import base64
+from binascii import a2b_base64, b2a_base64
 from Crypto.Cipher import AES
 from http import HTTPStatus
-import json
-import math
+import hmac
 import logging
-import queue
 import random
+import secrets
 import string
 import time
 from typing import Callable
 
-from .config import Config, Encryption
+from . import json_utils
+from .config import Config
 from .aircon import Device
 from .error import Error, KeyIdReplaced
 
+_ZERO = b'\x00'
+# Base64 output needs no JSON escaping, so the envelope is filled in directly.
+_ENCRYPTED_TEMPLATE = b'{"enc":"%s","sign":"%s"}'
+_QUEUED_COMMANDS_TEMPLATE = b'{"queued_commands":%d}'
+
+
+def _json_response(data) -> web.Response:
+  return web.Response(body=json_utils.dumps(data), content_type='application/json')
+
 
 class QueryHandlers:
 
@@ -22,6 +31,21 @@ class QueryHandlers:
     self._devices_map = {}
     for device in devices:
       self._devices_map[device.ip_address] = device
+    # Most setups control a single device, which commands need not name.
+    self._single_device = devices[0] if len(devices) == 1 else None
+    # Distinguishes ETags across restarts, as property versions start over.
+    self._etag_prefix = secrets.token_hex(4)
+    self._status_cache = (None, None)  # (ETag, body) of the last status response.
+
+  def _get_device(self, request: web.Request) -> Device:
+    """Returns the device that sent the request, by its IP address."""
+    remote = request.remote
+    if remote.startswith('::ffff:'):  # IPv4-mapped IPv6 address.
+      remote = remote[7:]
+    device = self._devices_map.get(remote)
+    if not device:
+      raise web.HTTPNotFound(reason=f'Unknown device "{request.remote}".')
+    return device
 
   async def key_exchange_handler(self, request: web.Request) -> web.Response:
     """Handles a key exchange.
@@ -32,18 +56,17 @@ class QueryHandlers:
     AC.
     """
     updated_keys = {}
-    post_data = await request.text()
-    data = json.loads(post_data)
+    data = json_utils.loads(await request.read())
     try:
       key = data['key_exchange']
       if key['ver'] != 1 or key['proto'] != 1 or key.get('sec'):
-        logging.error(f'Invalid key exchange: {data}')
+        logging.error('Invalid key exchange: %s', data)
         raise web.HTTPBadRequest(reason=f'Invalid key exchange: {data}')
-      updated_keys = self._devices_map[request.remote].update_key(key)
+      updated_keys = self._get_device(request).update_key(key)
     except KeyIdReplaced as e:
-      logging.error(f'{e.title}\n{e.message}')
+      logging.error('%s\n%s', e.title, e.message)
       return web.Response(status=HTTPStatus.NOT_FOUND.value, reason=f'{e.title}\n{e.message}')
-    return web.json_response(updated_keys)
+    return _json_response(updated_keys)
 
   async def command_handler(self, request: web.Request) -> web.Response:
     """Handles a command request.
@@ -51,24 +74,24 @@ class QueryHandlers:
     builds the JSON, encrypts and signs it, and sends it to the AC.
     """
     command = {}
-    device = self._devices_map[request.remote]
+    device = self._get_device(request)
     command['seq_no'] = device.get_command_seq_no()
-    try:
-      command_entry = device.commands_queue.get_nowait()
+    command_entry = device.pop_command()
+    if command_entry:
       command['data'], property_updater = command_entry.command, command_entry.updater
-    except queue.Empty:
+    else:
       command['data'], property_updater = {}, None
     if property_updater:
       property_updater()  #TODO: should be async as well?
-    return web.json_response(self._encrypt_and_sign(device, command))
+    return web.Response(body=self._encrypt_and_sign(device, command),
+                        content_type='application/json')
 
   async def property_update_handler(self, request: web.Request) -> web.Response:
     """Handles a property update request.
     Decrypts, validates, and pushes the value into the local properties store.
     """
-    device = self._devices_map[request.remote]
-    post_data = await request.text()
-    data = json.loads(post_data)
+    device = self._get_device(request)
+    data = json_utils.loads(await request.read())
     try:
       update = self._decrypt_and_validate(device, data)
     except Error:
@@ -79,7 +102,7 @@ class QueryHandlers:
       return response
     try:
       if not update['data']:
-        logging.info('Unsupported update message = {}'.format(update['seq_no']))
+        logging.info('Unsupported update message = %s', update['seq_no'])
         return response
       name = update['data']['name']
       # Fix A/C typos.
@@ -89,7 +112,7 @@ class QueryHandlers:
       value = data_type(update['data']['value'])
       device.update_property(name, value)
     except Exception as ex:
-      logging.error('Failed to handle {}. Exception = {}'.format(update, ex))
+      logging.error('Failed to handle %s. Exception = %s', update, ex)
       #TODO: Should return internal error?
     return response
 
@@ -97,20 +120,36 @@ class QueryHandlers:
     """Handles get status request (by a smart home hub).
     Returns the current internally stored state of the AC.
     """
-    devices = []
-    for device in self._devices_map.values():
-      if 'device_ip' in request.query.keys() and device.ip_address != request.query['device_ip']:
-        continue
-      devices.append({'ip': device.ip_address, 'props': device.get_all_properties().to_dict()})
-    return web.json_response({'devices': devices})
+    device_ip = request.query.get('device_ip')
+    if device_ip is None:
+      devices = list(self._devices_map.values())
+    else:
+      device = self._devices_map.get(device_ip)
+      devices = [device] if device else []
+    # Names the selected devices too, as versions alone collide across devices.
+    etag = '"{}-{}"'.format(
+        self._etag_prefix,
+        '.'.join(f'{device.ip_address}:{device.properties_version}' for device in devices))
+    if request.headers.get('If-None-Match') == etag:
+      return web.Response(status=HTTPStatus.NOT_MODIFIED.value, headers={'ETag': etag})
+    cached_etag, body = self._status_cache
+    if etag != cached_etag:
+      body = json_utils.dumps({
+          'devices': [{
+              'ip': device.ip_address,
+              'props': device.get_properties_dict()
+          } for device in devices]
+      })
+      self._status_cache = (etag, body)
+    return web.Response(body=body, content_type='application/json', headers={'ETag': etag})
 
   async def queue_command_handler(self, request: web.Request) -> web.Response:
     """Handles queue command request (by a smart home hub).
     """
     device = self._devices_map.get(request.query.get('device_ip'))
     if not device:
-      if len(self._devices_map) == 1:
-        device = list(self._devices_map.values())[0]
+      if self._single_device:
+        device = self._single_device
       else:
         raise web.HTTPBadRequest(reason=f'Device "{request.query.get("device_ip")}" not found.')
     try:
@@ -118,37 +157,44 @@ class QueryHandlers:
     except Exception as ex:
       logging.exception('Failed to queue command.')
       raise web.HTTPBadRequest(f'Failed to queue command:\n{ex!r}')
-    return web.json_response({'queued_commands': device.commands_queue.qsize()})
+    return web.Response(body=_QUEUED_COMMANDS_TEMPLATE % len(device.commands_queue),
+                        content_type='application/json')
 
-  def _encrypt_and_sign(self, device: Device, data: dict) -> dict:
-    text = json.dumps(data)
-    logging.debug('Encrypting: {}'.format(text))
-    text = text.encode('utf-8')
+  def _encrypt_and_sign(self, device: Device, data: dict) -> bytes:
+    text = json_utils.dumps(data)
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+      logging.debug('Encrypting: %s', text.decode('utf-8'))
     encryption = device.get_app_encryption()
-    return {
-        "enc": base64.b64encode(encryption.cipher.encrypt(self.pad(text))).decode('utf-8'),
-        "sign": base64.b64encode(Encryption.hmac_digest(encryption.sign_key, text)).decode('utf-8')
-    }
+    padded = self.pad(text)
+    encryption.cipher.encrypt(padded, output=padded)  # In place.
+    enc = b2a_base64(padded, newline=False)
+    sign = b2a_base64(encryption.sign(text), newline=False)
+    return _ENCRYPTED_TEMPLATE % (enc, sign)
 
   def _decrypt_and_validate(self, device: Device, data: dict) -> dict:
     encryption = device.get_dev_encryption()
-    text = self.unpad(encryption.cipher.decrypt(base64.b64decode(data['enc'])))
-    sign = base64.b64encode(Encryption.hmac_digest(encryption.sign_key, text)).decode('utf-8')
-    if sign != data['sign']:
+    text = self.unpad(encryption.cipher.decrypt(a2b_base64(data['enc'])))
+    try:
+      valid = hmac.compare_digest(encryption.sign(text), a2b_base64(data['sign']))
+    except ValueError:  # Malformed base64.
+      valid = False
+    if not valid:
       raise Error(f'Invalid signature for:\n{text.decode("utf-8")}!')
-    logging.info('Decrypted: %s', text.decode('utf-8'))
+    if logging.getLogger().isEnabledFor(logging.INFO):
+      logging.info('Decrypted: %s', text.decode('utf-8'))
     try:
-      return json.loads(text.decode('utf-8'))
+      return json_utils.loads(text)
     except Exception as ex:
       raise Error(f'Failed to decode message, {ex!r}:\n{text.decode("utf-8")}')
 
   @staticmethod
-  def pad(data: bytes):
+  def pad(data: bytes) -> bytearray:
     """Zero padding for AES data encryption (non standard)."""
-    new_size = math.ceil(len(data) / AES.block_size) * AES.block_size
-    return data.ljust(new_size, bytes([0]))
+    padded = bytearray(len(data) + (-len(data) % AES.block_size))
+    padded[:len(data)] = data
+    return padded
 
   @staticmethod
   def unpad(data: bytes):
     """Remove Zero padding for AES data encryption (non standard)."""
-    return data.rstrip(bytes([0]))
+    return data.rstrip(_ZERO)
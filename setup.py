@@ -19,9 +19,9 @@ setuptools.setup(
     license='GPL 3.0',
     packages=setuptools.find_packages(),
     install_requires=[
-        'aiohttp==3.10.11', 'dataclasses_json', 'pycryptodome', 'paho-mqtt==1.6.1', 'tenacity',
-        'get-mac', 'retry'
+        'aiohttp==3.10.11', 'pycryptodome', 'paho-mqtt==1.6.1', 'tenacity', 'get-mac', 'retry'
     ],
+    extras_require={'fast': ['orjson', 'uvloop']},
     classifiers=[
         'Programming Language :: Python :: 3',
         'License :: OSI Approved :: GNU General Public License v3 or later (GPLv3+)',
@@ -0,0 +1,112 @@
+import asyncio
+import unittest
+
+from aircon.aircon import AcDevice
+from aircon.mqtt_client import MqttClient
+
+_CONNACK = b'\x20\x02\x00\x00'
+_MQTT_TOPICS = {'pub': 'ac/{}/{}/status', 'sub': 'ac/{}/{}/command'}
+
+
+def _encode_length(length: int) -> bytes:
+  encoded = bytearray()
+  while True:
+    length, digit = divmod(length, 128)
+    encoded.append(digit | 0x80 if length else digit)
+    if not length:
+      return bytes(encoded)
+
+
+def _publish_packet(topic: str, payload: bytes) -> bytes:
+  body = len(topic).to_bytes(2, 'big') + topic.encode('utf-8') + payload
+  return b'\x30' + _encode_length(len(body)) + body
+
+
+def _suback_packet(body: bytes) -> bytes:
+  # Grants QoS 0 for every topic filter in the SUBSCRIBE body.
+  packet_id, pos, granted = body[:2], 2, 0
+  while pos < len(body):
+    pos += 2 + int.from_bytes(body[pos:pos + 2], 'big') + 1
+    granted += 1
+  return b'\x90' + _encode_length(2 + granted) + packet_id + b'\x00' * granted
+
+
+async def _read_packet(reader: asyncio.StreamReader) -> (int, bytes):
+  packet_type = (await reader.readexactly(1))[0] & 0xF0
+  length, shift = 0, 0
+  while True:
+    digit = (await reader.readexactly(1))[0]
+    length += (digit & 0x7F) << shift
+    shift += 7
+    if not digit & 0x80:
+      break
+  return packet_type, await reader.readexactly(length)
+
+
+class MqttClientTest(unittest.IsolatedAsyncioTestCase):
+
+  async def asyncSetUp(self):
+    self.device = AcDevice(
+        {
+            'name': 'ac',
+            'app': 'app',
+            'model': 'model',
+            'sw_version': '1',
+            'mac_address': '001122334455',
+            'ip_address': '10.0.0.1',
+            'lanip_key': 'k' * 16,
+            'lanip_key_id': 1
+        }, lambda *args: None)
+    self.received = []  # Packet types sent by the client.
+    self.served = asyncio.get_running_loop().create_future()
+    self.server = await asyncio.start_server(self._serve, '127.0.0.1', 0)
+    self.port = self.server.sockets[0].getsockname()[1]
+
+  async def asyncTearDown(self):
+    self.server.close()
+    await self.server.wait_closed()
+
+  async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    try:
+      while True:
+        packet_type, body = await _read_packet(reader)
+        self.received.append(packet_type)
+        if packet_type == 0x10:  # CONNECT
+          writer.write(_CONNACK)
+        elif packet_type == 0x80:  # SUBSCRIBE
+          writer.write(_suback_packet(body))
+          if self.received.count(0x80) == 1:
+            writer.write(
+                _publish_packet(_MQTT_TOPICS['sub'].format(self.device.mac_address, 't_temp'),
+                                b'23'))
+        elif packet_type == 0xE0:  # DISCONNECT
+          break
+    except asyncio.IncompleteReadError:
+      pass
+    finally:
+      writer.close()
+      self.served.set_result(None)
+
+  async def test_event_loop_reads_commands(self):
+    client = MqttClient('test', _MQTT_TOPICS, [self.device])
+    client.attach_to_event_loop(asyncio.get_running_loop())
+    self.assertIsNotNone(client.on_socket_open)
+    self.assertIsNotNone(client.on_socket_register_write)
+    client.connect('127.0.0.1', self.port)
+    try:
+      for _ in range(100):
+        if self.device.commands_queue:
+          break
+        await asyncio.sleep(0.05)
+    finally:
+      client.disconnect()
+    await asyncio.wait_for(self.served, 5)
+    self.assertIn(0x80, self.received)  # Subscribed once CONNACK was read.
+    self.assertEqual(1, len(self.device.commands_queue))
+    command = self.device.commands_queue[0].command
+    self.assertEqual('t_temp', command['properties'][0]['property']['name'])
+    self.assertEqual(23, command['properties'][0]['property']['value'])
+
+
+if __name__ == '__main__':
+  unittest.main()